@@ -3,30 +3,126 @@
 Check if running on OCI instance and detect available authentication methods
 """
 
+import argparse
+import copy
+import http.client
 import json
 import os
+import re
 import sys
-import requests
 import socket
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        # orjson writes raw UTF-8; keep json.dumps' \uXXXX escaping (ensure_ascii)
+        # for non-ASCII compartment names and error messages
+        output = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        if output.isascii():
+            return output.decode()
+        return json.dumps(obj, indent=2)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+    
+    _loads = json.loads
+
+def _metadata_cache_ttl() -> float:
+    """
+    Read the metadata cache TTL, falling back to 300s on malformed values
+    """
+    try:
+        return float(os.environ.get('OCI_METADATA_CACHE_TTL', 300))
+    except ValueError:
+        return 300.0
+
+# Instance metadata is fetched at most once per TTL; failed probes are not cached
+METADATA_CACHE_TTL = _metadata_cache_ttl()
+_metadata_lock = threading.Lock()
+_metadata_cache: Optional[Dict[str, Any]] = None
+_metadata_fetched_at = 0.0
+
+# Fail fast when the link-local metadata address is unreachable (not on OCI),
+# but give a reachable metadata service enough time to answer
+METADATA_TIMEOUT = (0.1, 2.0)  # (connect, read) seconds
+
+# Instance metadata service (IMDS v2 requires the Oracle bearer header)
+METADATA_HOST = '169.254.169.254'
+METADATA_HEADERS = {'Authorization': 'Bearer Oracle'}
+
+def _fast_oci_probe() -> bool:
+    """
+    Raw TCP connect to the metadata service; fails in milliseconds off OCI
+    """
+    try:
+        sock = socket.create_connection((METADATA_HOST, 80), timeout=METADATA_TIMEOUT[0])
+        sock.close()
+        return True
+    except OSError:
+        return False
+
+def _metadata_get(path: str) -> Tuple[int, bytes]:
+    """
+    GET one metadata path on its own connection, returning (status, body)
+    """
+    conn = http.client.HTTPConnection(METADATA_HOST, timeout=METADATA_TIMEOUT[0])
+    try:
+        conn.connect()
+        conn.sock.settimeout(METADATA_TIMEOUT[1])
+        conn.request('GET', path, headers=METADATA_HEADERS)
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
 
 def check_instance_metadata() -> Optional[Dict[str, Any]]:
     """
     Check if running on OCI instance by querying instance metadata service
     """
-    try:
-        # OCI instance metadata service endpoint
-        metadata_url = "http://169.254.169.254/opc/v2/instance/"
+    global _metadata_cache, _metadata_fetched_at
+    
+    with _metadata_lock:
+        if _metadata_cache is not None and time.monotonic() - _metadata_fetched_at < METADATA_CACHE_TTL:
+            return dict(_metadata_cache)
         
-        # Try to connect to metadata service with short timeout
-        response = requests.get(metadata_url, timeout=2)
+        instance_info = _fetch_instance_metadata()
+        if instance_info is not None:
+            _metadata_cache = instance_info
+            _metadata_fetched_at = time.monotonic()
+            return dict(instance_info)
         
-        if response.status_code == 200:
-            instance_data = response.json()
+        return None
+
+def _fetch_instance_metadata() -> Optional[Dict[str, Any]]:
+    """
+    Query the instance metadata service (uncached)
+    """
+    if not _fast_oci_probe():
+        return None
+    
+    try:
+        # Fetch instance and identity metadata concurrently, one connection per request
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            instance_future = executor.submit(_metadata_get, '/opc/v2/instance/')
+            identity_future = executor.submit(_metadata_get, '/opc/v2/identity/')
+            
+            status, body = instance_future.result()
+            if status != 200:
+                return None
+            
+            instance_data = _loads(body)
             
-            # Get additional metadata
-            identity_url = "http://169.254.169.254/opc/v2/identity/"
-            identity_response = requests.get(identity_url, timeout=2)
+            try:
+                identity_available = identity_future.result()[0] == 200
+            except Exception:
+                identity_available = False
             
             return {
                 'is_oci_instance': True,
@@ -36,25 +132,45 @@ def check_instance_metadata() -> Optional[Dict[str, Any]]:
                 'shape': instance_data.get('shape'),
                 'availability_domain': instance_data.get('availabilityDomain'),
                 'fault_domain': instance_data.get('faultDomain'),
-                'identity_available': identity_response.status_code == 200
+                'identity_available': identity_available
             }
     except Exception:
         pass
     
     return None
 
-def check_instance_principal_auth() -> bool:
+_oci = None
+
+def _get_oci():
+    """
+    Import the OCI SDK on first use; it is only needed once a cheap check passes
+    """
+    global _oci
+    if _oci is None:
+        import oci
+        _oci = oci
+    return _oci
+
+def check_instance_principal_auth(validate: bool = False) -> bool:
     """
     Check if instance principal authentication is available
+    
+    The signer constructor already fails when instance principal is not set up;
+    pass validate=True to also confirm it with an Identity API call.
     """
+    # Instance principal signers are issued through the metadata service
+    if not _fast_oci_probe():
+        return False
+    
     try:
-        import oci
+        oci = _get_oci()
         # Try to create instance principal signer
         signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
         
-        # Test the signer by making a simple API call
-        identity = oci.identity.IdentityClient(config={}, signer=signer)
-        identity.get_tenancy(signer.tenancy_id)
+        if validate:
+            # Test the signer by making a simple API call
+            identity = oci.identity.IdentityClient(config={}, signer=signer)
+            identity.get_tenancy(signer.tenancy_id)
         
         return True
     except Exception:
@@ -64,172 +180,250 @@ def check_resource_principal_auth() -> bool:
     """
     Check if resource principal authentication is available
     """
+    # Check for resource principal environment variables before touching the SDK
+    required_vars = ['OCI_RESOURCE_PRINCIPAL_VERSION', 'OCI_RESOURCE_PRINCIPAL_RPST']
+    if not all(var in os.environ for var in required_vars):
+        return False
+    
     try:
-        import oci
-        # Check for resource principal environment variables
-        required_vars = ['OCI_RESOURCE_PRINCIPAL_VERSION', 'OCI_RESOURCE_PRINCIPAL_RPST']
-        
-        if all(var in os.environ for var in required_vars):
-            # Try to create resource principal signer
-            signer = oci.auth.signers.get_resource_principals_signer()
-            return True
+        # Try to create resource principal signer
+        _get_oci().auth.signers.get_resource_principals_signer()
+        return True
     except Exception:
-        pass
-    
-    return False
+        return False
+
+# Matches ConfigParser's SECTCRE: headers must start at column 0
+_SECTION_RE = re.compile(r'^\[([^\]]+)\]')
+
+# Parsed config file result keyed by (path, st_mtime_ns, st_size)
+_config_file_cache: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
 
 def check_config_file_auth() -> Dict[str, Any]:
     """
     Check for OCI config file authentication
     """
     config_file_path = os.path.expanduser('~/.oci/config')
-    config_exists = os.path.exists(config_file_path)
     
+    # One stat both checks existence and keys the cache
+    try:
+        st = os.stat(config_file_path)
+    except OSError:
+        return {
+            'available': False,
+            'config_path': config_file_path,
+            'error': 'Config file not found'
+        }
+    
+    cache_key = (config_file_path, st.st_mtime_ns, st.st_size)
+    cached = _config_file_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+    
+    result = _read_config_file_auth(config_file_path)
+    if result['available']:
+        _config_file_cache.clear()
+        _config_file_cache[cache_key] = copy.deepcopy(result)
+    return result
+
+def _read_config_file_auth(config_file_path: str) -> Dict[str, Any]:
+    """
+    Scan an existing OCI config file and validate its DEFAULT profile (uncached)
+    """
     profiles = []
-    if config_exists:
-        try:
-            import oci
-            from configparser import ConfigParser
-            
-            parser = ConfigParser()
-            parser.read(config_file_path)
-            profiles = list(parser.sections())
-            
-            # Try to validate DEFAULT profile
+    try:
+        # Single line scan for section headers instead of a full ConfigParser read
+        has_default = False
+        with open(config_file_path, 'r') as config_file:
+            for line in config_file:
+                match = _SECTION_RE.match(line)
+                if not match:
+                    continue
+                section = match.group(1)
+                if section == 'DEFAULT':
+                    has_default = True
+                elif section not in profiles:
+                    profiles.append(section)
+        
+        # Try to validate DEFAULT profile (only parsed by the SDK if present)
+        default_valid = False
+        if has_default:
             try:
+                oci = _get_oci()
                 config = oci.config.from_file()
                 oci.config.validate_config(config)
                 default_valid = True
             except Exception:
                 default_valid = False
-                
-            return {
-                'available': True,
-                'config_path': config_file_path,
-                'profiles': profiles,
-                'default_profile_valid': default_valid
-            }
-        except Exception as e:
-            return {
-                'available': False,
-                'error': str(e)
-            }
-    
-    return {
-        'available': False,
-        'config_path': config_file_path,
-        'error': 'Config file not found'
+            
+        return {
+            'available': True,
+            'config_path': config_file_path,
+            'profiles': profiles,
+            'default_profile_valid': default_valid
+        }
+    except Exception as e:
+        return {
+            'available': False,
+            'error': str(e)
+        }
+
+# Recommendation templates keyed by (method, available); nested values are
+# immutable so the shallow copies handed to callers cannot alter the table
+_RECOMMENDATIONS = {
+    ('instance_principal', True): {
+        'priority': 1,
+        'method': 'instance_principal',
+        'reason': 'Running on OCI instance with instance principal configured',
+        'security': 'High - No credentials to manage',
+        'setup_required': False
+    },
+    ('instance_principal', False): {
+        'priority': 2,
+        'method': 'instance_principal',
+        'reason': 'Running on OCI instance but instance principal not configured',
+        'security': 'High - No credentials to manage',
+        'setup_required': True,
+        'setup_steps': (
+            'Create dynamic group for instances',
+            'Add policy statements for Logan access',
+            'No instance restart required'
+        )
+    },
+    ('resource_principal', True): {
+        'priority': 1,
+        'method': 'resource_principal',
+        'reason': 'Resource principal environment detected (Functions/Container)',
+        'security': 'High - Managed by OCI',
+        'setup_required': False
+    },
+    ('config_file', True): {
+        'priority': 3,
+        'method': 'config_file',
+        'reason': 'OCI CLI configuration found',
+        'security': 'Medium - API key stored locally',
+        'setup_required': False
+    },
+    ('config_file', False): {
+        'priority': 4,
+        'method': 'config_file',
+        'reason': 'Can be configured with OCI CLI',
+        'security': 'Medium - API key stored locally',
+        'setup_required': True,
+        'setup_steps': (
+            'Install OCI CLI',
+            'Run: oci setup config',
+            'Create API key in OCI Console',
+            'Add API key to user'
+        )
     }
+}
+
+def _check_instance_auth(resource_principal: bool, validate: bool) -> Tuple[Optional[Dict[str, Any]], Optional[bool]]:
+    """
+    Probe instance metadata, then instance principal, returning (instance_info, instance_principal)
+    """
+    # Functions and Container Instances never expose the metadata service, so a
+    # working resource principal skips the probe entirely. A stale or partial
+    # resource principal environment (signer construction failed) still probes.
+    if resource_principal:
+        instance_info = None
+    else:
+        instance_info = check_instance_metadata()
+    
+    # None means the check was skipped because a resource principal is available
+    if resource_principal:
+        return instance_info, None
+    
+    # Only pay for the instance principal check when running on an instance
+    if instance_info:
+        return instance_info, check_instance_principal_auth(validate)
+    return instance_info, False
 
-def get_environment_suggestion() -> Dict[str, Any]:
+def get_environment_suggestion(validate: bool = False) -> Dict[str, Any]:
     """
     Suggest the best authentication method based on environment
+    
+    validate=True confirms instance principal with an Identity API call
+    instead of trusting signer construction.
     """
-    instance_info = check_instance_metadata()
+    # Cheapest check first: resource principal is detected from environment variables
+    resource_principal = check_resource_principal_auth()
+    
+    # The metadata/instance principal chain (network) and the config file check
+    # (disk + SDK validation) are independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        instance_future = executor.submit(_check_instance_auth, resource_principal, validate)
+        config_future = executor.submit(check_config_file_auth)
+        instance_info, instance_principal = instance_future.result()
+        config_file = config_future.result()
     
     result = {
         'is_oci_instance': instance_info is not None,
         'instance_metadata': instance_info,
         'auth_methods': {
-            'instance_principal': False,
-            'resource_principal': False,
-            'config_file': check_config_file_auth()
+            'instance_principal': instance_principal,
+            'resource_principal': resource_principal,
+            'config_file': config_file
         },
         'recommendations': []
     }
     
-    # Check available auth methods
-    if instance_info:
-        result['auth_methods']['instance_principal'] = check_instance_principal_auth()
-        
-    result['auth_methods']['resource_principal'] = check_resource_principal_auth()
-    
-    # Make recommendations
-    if result['auth_methods']['instance_principal']:
-        result['recommendations'].append({
-            'priority': 1,
-            'method': 'instance_principal',
-            'reason': 'Running on OCI instance with instance principal configured',
-            'security': 'High - No credentials to manage',
-            'setup_required': False
-        })
-    elif instance_info and not result['auth_methods']['instance_principal']:
-        result['recommendations'].append({
-            'priority': 2,
-            'method': 'instance_principal',
-            'reason': 'Running on OCI instance but instance principal not configured',
-            'security': 'High - No credentials to manage',
-            'setup_required': True,
-            'setup_steps': [
-                'Create dynamic group for instances',
-                'Add policy statements for Logan access',
-                'No instance restart required'
-            ]
-        })
-    
-    if result['auth_methods']['resource_principal']:
-        result['recommendations'].append({
-            'priority': 1,
-            'method': 'resource_principal',
-            'reason': 'Resource principal environment detected (Functions/Container)',
-            'security': 'High - Managed by OCI',
-            'setup_required': False
-        })
-    
-    if result['auth_methods']['config_file']['available']:
-        result['recommendations'].append({
-            'priority': 3,
-            'method': 'config_file',
-            'reason': 'OCI CLI configuration found',
-            'security': 'Medium - API key stored locally',
-            'setup_required': False,
-            'profiles': result['auth_methods']['config_file']['profiles']
-        })
-    else:
-        result['recommendations'].append({
-            'priority': 4,
-            'method': 'config_file',
-            'reason': 'Can be configured with OCI CLI',
-            'security': 'Medium - API key stored locally',
-            'setup_required': True,
-            'setup_steps': [
-                'Install OCI CLI',
-                'Run: oci setup config',
-                'Create API key in OCI Console',
-                'Add API key to user'
-            ]
-        })
+    # Make recommendations from the static table
+    auth_methods = result['auth_methods']
+    config_available = auth_methods['config_file']['available']
+    
+    candidates = []
+    if instance_info and not resource_principal:
+        candidates.append(('instance_principal', auth_methods['instance_principal']))
+    if resource_principal:
+        candidates.append(('resource_principal', True))
+    candidates.append(('config_file', config_available))
+    
+    # Single pass over the table picks the best method (first lowest priority wins)
+    best_method = None
+    for candidate in candidates:
+        recommendation = dict(_RECOMMENDATIONS[candidate])
+        if candidate == ('config_file', True):
+            recommendation['profiles'] = auth_methods['config_file']['profiles']
+        result['recommendations'].append(recommendation)
+        if best_method is None or recommendation['priority'] < best_method['priority']:
+            best_method = recommendation
     
     # Sort recommendations by priority
     result['recommendations'].sort(key=lambda x: x['priority'])
     
-    # Add suggested default config
-    if result['recommendations']:
-        best_method = result['recommendations'][0]
-        
+    # Add suggested default config (there is always at least the config_file entry)
+    if best_method['method'] == 'instance_principal' and instance_info:
         result['suggested_config'] = {
             'authType': best_method['method'],
-            'setupRequired': best_method.get('setup_required', False)
+            'setupRequired': best_method['setup_required'],
+            'compartmentId': instance_info['compartment_id'],
+            'region': instance_info['region']
+        }
+    else:
+        result['suggested_config'] = {
+            'authType': best_method['method'],
+            'setupRequired': best_method['setup_required']
         }
-        
-        if instance_info and best_method['method'] == 'instance_principal':
-            result['suggested_config'].update({
-                'compartmentId': instance_info['compartment_id'],
-                'region': instance_info['region']
-            })
     
     return result
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description='Detect OCI environment and authentication methods')
+    parser.add_argument('--validate', action='store_true',
+                        help='Confirm instance principal with an Identity API call')
+    args = parser.parse_args()
+    
     try:
-        result = get_environment_suggestion()
-        print(json.dumps(result, indent=2))
+        result = get_environment_suggestion(validate=args.validate)
+        print(_dumps(result))
         
-        # Exit with code 0 if instance principal is available and configured
+        # Exit with code 0 if instance or resource principal is available and configured
         # Exit with code 1 if on OCI but needs setup
         # Exit with code 2 if not on OCI
-        if result['auth_methods']['instance_principal']:
+        auth_methods = result['auth_methods']
+        if auth_methods['instance_principal'] or auth_methods['resource_principal']:
             sys.exit(0)
         elif result['is_oci_instance']:
             sys.exit(1)
@@ -237,10 +431,10 @@ def main():
             sys.exit(2)
             
     except Exception as e:
-        print(json.dumps({
+        print(_dumps({
             'error': str(e),
             'is_oci_instance': False
-        }, indent=2))
+        }))
         sys.exit(2)
 
 if __name__ == '__main__':
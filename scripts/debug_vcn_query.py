@@ -5,74 +5,80 @@ Debug script to check VCN query execution
 
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from logan_client import LoganClient
 
-def debug_vcn_query():
-    """Debug VCN flow query to see what's happening"""
-    client = LoganClient()
-    
-    # Test with different time periods
-    time_periods = [60, 1440, 10080]  # 1h, 24h, 7d
-    
-    for minutes in time_periods:
-        print(f"\n📊 Testing VCN query with {minutes} minutes:")
-        
-        # Calculate expected max records
-        max_records = min(50000, max(1000, minutes * 30))
-        print(f"   Expected max records: {max_records}")
-        
-        # Build the query
-        query = f"""
-        'Log Source' = 'OCI VCN Flow Unified Schema Logs' 
+# Only the head limit varies between debug runs
+_VCN_QUERY_TEMPLATE = """
+        'Log Source' = 'OCI VCN Flow Unified Schema Logs'
         | where 'Source IP' != "" and 'Destination IP' != ""
         | fields Time, 'Source IP', 'Destination IP', 'Source Port', 'Destination Port', Action
         | sort -Time
         | head {max_records}
         """
-        
-        print(f"   Query: {query.strip()}")
-        
-        try:
-            # Execute query
-            result = client.execute_query(query, minutes, max_records)
-            
-            if result.get("success"):
+
+def _run(fn, *args):
+    """Call fn(*args), returning (result, exception)"""
+    try:
+        return fn(*args), None
+    except Exception as e:
+        return None, e
+
+def debug_vcn_query():
+    """Debug VCN flow query to see what's happening"""
+    client = LoganClient()
+
+    # Test with different time periods
+    time_periods = [60, 1440, 10080]  # 1h, 24h, 7d
+
+    console_query = _VCN_QUERY_TEMPLATE.format(max_records=100)
+
+    # The queries are I/O bound, so run them concurrently and report in submission order
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        period_runs = []
+        for minutes in time_periods:
+            # Calculate expected max records
+            max_records = min(50000, max(1000, minutes * 30))
+
+            # Build the query
+            query = _VCN_QUERY_TEMPLATE.format(max_records=max_records)
+            future = executor.submit(_run, client.execute_query, query, minutes, max_records)
+            period_runs.append((minutes, max_records, query, future))
+
+        # Also test the execute_query_like_console method
+        console_future = executor.submit(_run, client.execute_query_like_console, console_query, 60)
+
+        for minutes, max_records, query, future in period_runs:
+            print(f"\n📊 Testing VCN query with {minutes} minutes:")
+            print(f"   Expected max records: {max_records}")
+            print(f"   Query: {query.strip()}")
+
+            result, error = future.result()
+            if error is not None:
+                print(f"   ❌ Exception: {error}")
+            elif result.get("success"):
                 records = result.get("results", [])
                 print(f"   ✅ Success: Got {len(records)} records")
-                
+
                 # Check if we're getting exactly 10 records
                 if len(records) == 10:
                     print(f"   ⚠️  WARNING: Getting exactly 10 records - might be a default limit")
-                    
+
                 # Show first few records
                 if records:
                     print(f"   Sample record: {json.dumps(records[0], indent=2)}")
             else:
                 print(f"   ❌ Failed: {result.get('error', 'Unknown error')}")
-                
-        except Exception as e:
-            print(f"   ❌ Exception: {e}")
-            
-    # Also test the execute_query_like_console method
-    print("\n\n🔍 Testing execute_query_like_console method:")
-    try:
-        query = """
-        'Log Source' = 'OCI VCN Flow Unified Schema Logs' 
-        | where 'Source IP' != "" and 'Destination IP' != ""
-        | fields Time, 'Source IP', 'Destination IP', 'Source Port', 'Destination Port', Action
-        | sort -Time
-        | head 100
-        """
-        
-        result = client.execute_query_like_console(query, 60)
-        if result.get("success"):
+
+        print("\n\n🔍 Testing execute_query_like_console method:")
+        result, error = console_future.result()
+        if error is not None:
+            print(f"   ❌ Exception: {error}")
+        elif result.get("success"):
             records = result.get("results", [])
             print(f"   ✅ Got {len(records)} records with execute_query_like_console")
         else:
             print(f"   ❌ Failed: {result.get('error', 'Unknown error')}")
-            
-    except Exception as e:
-        print(f"   ❌ Exception: {e}")
 
 if __name__ == "__main__":
-    debug_vcn_query()
\ No newline at end of file
+    debug_vcn_query()
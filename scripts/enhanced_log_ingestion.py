@@ -5,14 +5,93 @@ Supports VCN Flow Logs, WAF Logs, and other security sources
 """
 
 import json
+import os
+import re
 import sys
 import argparse
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from collections import defaultdict
-from typing import Dict, List, Any
+from collections import Counter, defaultdict
+from collections.abc import Hashable
+from typing import Dict, List, Any, Optional, Tuple
 from logan_client import LoganClient
 import oracledb  # For ADW connection
 
+try:
+    import orjson
+    
+    def _write_json(obj: Any):
+        # orjson encodes the whole payload to bytes in one fast call (it cannot
+        # stream) and the bytes go to stdout without a str round trip.
+        # Datetimes go through default=str, matching the stdlib output
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_APPEND_NEWLINE
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(obj, option=option, default=str))
+        sys.stdout.buffer.flush()
+except ImportError:
+    def _write_json(obj: Any):
+        # json.dump writes chunk by chunk, so the full JSON text is never held
+        # in memory (slower to encode than orjson)
+        json.dump(obj, sys.stdout, indent=2, default=str)
+        sys.stdout.write('\n')
+
+# Attack type keywords by severity, compiled once; high is checked before medium
+_HIGH_SEVERITY_RE = re.compile(r'sql injection|xss|rce|command injection|path traversal', re.IGNORECASE)
+_MEDIUM_SEVERITY_RE = re.compile(r'csrf|xxe|directory traversal|file inclusion', re.IGNORECASE)
+
+def _fields_clause(fields: List[str]) -> str:
+    """Quote field names containing spaces for a '| fields' clause"""
+    return ', '.join(f"'{field}'" if ' ' in field else field for field in fields)
+
+def _is_valid_vcn_record(record: Any) -> bool:
+    """True if _process_vcn_flow_records can aggregate the record"""
+    return isinstance(record, dict)
+
+def _is_valid_waf_record(record: Any) -> bool:
+    """
+    True if _process_waf_records can count the record at all. Records with a
+    bad Country Code or Attack Type are still counted, only partly (see there)
+    """
+    return isinstance(record, dict) and isinstance(record.get('Action', ''), str)
+
+# WAF actions that count as a blocked request
+_BLOCK_ACTIONS = frozenset(('BLOCK', 'BLOCKED', 'DENY'))
+
+# Detected fields per source (from FIELD_MAPPINGS.md)
+_VCN_FIELDS = ['Time', 'Source IP', 'Destination IP', 'Source Port', 'Destination Port', 'Action']
+_WAF_FIELDS = ['Time', 'Client IP', 'Source IP', 'Request Method', 'Request URI', 'Response Code', 'User Agent', 'Action', 'Rule ID', 'Attack Type', 'Country Code', 'Request Size', 'Response Size']
+_LB_FIELDS = ['Time', 'Client IP', 'Source IP', 'Target IP', 'Request Method', 'Request URI', 'Response Code', 'Request Processing Time', 'Target Processing Time', 'Response Processing Time', 'User Agent']
+
+# Candidate source names, in priority order
+_WAF_SOURCES = ['OCI WAF Logs', 'OCI Web Application Firewall Logs', 'WAF Logs']
+_LB_SOURCES = ['OCI Load Balancer Logs', 'Load Balancer Access Logs', 'LB Access Logs']
+
+# Query templates are built once; only the source name and head limit vary per call
+_VCN_QUERY_TEMPLATE = f"""
+            'Log Source' = 'OCI VCN Flow Unified Schema Logs'
+            | where 'Source IP' != "" and 'Destination IP' != ""
+            | fields {_fields_clause(_VCN_FIELDS)}
+            | sort -Time
+            | head {{max_records}}
+            """
+
+_WAF_QUERY_TEMPLATE = f"""
+                'Log Source' = '{{source}}'
+                | where 'Client IP' != "" or 'Source IP' != ""
+                | fields {_fields_clause(_WAF_FIELDS)}
+                | sort -Time
+                | head {{max_records}}
+                """
+
+_LB_QUERY_TEMPLATE = f"""
+                'Log Source' = '{{source}}'
+                | where 'Client IP' != "" or 'Source IP' != ""
+                | fields {_fields_clause(_LB_FIELDS)}
+                | sort -Time
+                | head {{max_records}}
+                """
+
 class EnhancedLogIngestion:
     """Enhanced log ingestion supporting multiple OCI sources"""
     
@@ -67,18 +146,7 @@ class EnhancedLogIngestion:
         try:
             sys.stderr.write(f"Ingesting VCN Flow logs for {time_period_minutes} minutes...\n")
             
-            # Dynamically get detected fields (assuming LoganClient has a method; mock for now)
-            detected_fields = ['Time', 'Source IP', 'Destination IP', 'Source Port', 'Destination Port', 'Action']  # From FIELD_MAPPINGS.md
-            
-            fields_str = ', '.join(f"'{field}'" if ' ' in field else field for field in detected_fields)
-            
-            query = f"""
-            'Log Source' = 'OCI VCN Flow Unified Schema Logs'
-            | where 'Source IP' != "" and 'Destination IP' != ""
-            | fields {fields_str}
-            | sort -Time
-            | head {max_records}
-            """
+            query = _VCN_QUERY_TEMPLATE.format(max_records=max_records)
             
             result = self.client.execute_query_like_console(query, time_period_minutes)
             if not result.get('success'):
@@ -110,42 +178,28 @@ class EnhancedLogIngestion:
         try:
             sys.stderr.write(f"Ingesting WAF logs for {time_period_minutes} minutes...\n")
             
-            # Dynamically get detected fields
-            detected_fields = ['Time', 'Client IP', 'Source IP', 'Request Method', 'Request URI', 'Response Code', 'User Agent', 'Action', 'Rule ID', 'Attack Type', 'Country Code', 'Request Size', 'Response Size']
-            
-            fields_str = ', '.join(f"'{field}'" if ' ' in field else field for field in detected_fields)
-            
             # WAF logs query - check if source exists first
-            waf_sources = ['OCI WAF Logs', 'OCI Web Application Firewall Logs', 'WAF Logs']
+            queries = [(waf_source, _WAF_QUERY_TEMPLATE.format(source=waf_source, max_records=max_records))
+                       for waf_source in _WAF_SOURCES]
             
-            for waf_source in waf_sources:
-                query = f"""
-                'Log Source' = '{waf_source}'
-                | where 'Client IP' != "" or 'Source IP' != ""
-                | fields {fields_str}
-                | sort -Time
-                | head {max_records}
-                """
+            waf_source, records = self._query_first_source(queries, time_period_minutes)
+            if waf_source:
+                processed_data = self._process_waf_records(records)
                 
-                result = self.client.execute_query_like_console(query, time_period_minutes)
-                if result.get('success') and result.get('results'):
-                    records = result.get('results', [])
-                    processed_data = self._process_waf_records(records)
-                    
-                    # Sync to ADW
-                    self._sync_to_adw(records, 'waf')
-                    
-                    return {
-                        'success': True,
-                        'source': waf_source,
-                        'records_processed': len(records),
-                        'attacks': processed_data['attacks'],
-                        'blocked_requests': processed_data['blocked'],
-                        'threat_intelligence': processed_data['threats'],
-                        'geographic_data': processed_data['geography'],
-                        'stats': processed_data['stats'],
-                        'time_period_minutes': time_period_minutes
-                    }
+                # Sync to ADW
+                self._sync_to_adw(records, 'waf')
+                
+                return {
+                    'success': True,
+                    'source': waf_source,
+                    'records_processed': len(records),
+                    'attacks': processed_data['attacks'],
+                    'blocked_requests': processed_data['blocked'],
+                    'threat_intelligence': processed_data['threats'],
+                    'geographic_data': processed_data['geography'],
+                    'stats': processed_data['stats'],
+                    'time_period_minutes': time_period_minutes
+                }
             
             # If no WAF logs found, return empty but successful result
             return {
@@ -169,40 +223,26 @@ class EnhancedLogIngestion:
         try:
             sys.stderr.write(f"Ingesting Load Balancer logs for {time_period_minutes} minutes...\n")
             
-            # Dynamically get detected fields
-            detected_fields = ['Time', 'Client IP', 'Source IP', 'Target IP', 'Request Method', 'Request URI', 'Response Code', 'Request Processing Time', 'Target Processing Time', 'Response Processing Time', 'User Agent']
+            queries = [(lb_source, _LB_QUERY_TEMPLATE.format(source=lb_source, max_records=max_records))
+                       for lb_source in _LB_SOURCES]
             
-            fields_str = ', '.join(f"'{field}'" if ' ' in field else field for field in detected_fields)
-            
-            lb_sources = ['OCI Load Balancer Logs', 'Load Balancer Access Logs', 'LB Access Logs']
-            
-            for lb_source in lb_sources:
-                query = f"""
-                'Log Source' = '{lb_source}'
-                | where 'Client IP' != "" or 'Source IP' != ""
-                | fields {fields_str}
-                | sort -Time
-                | head {max_records}
-                """
+            lb_source, records = self._query_first_source(queries, time_period_minutes)
+            if lb_source:
+                processed_data = self._process_lb_records(records)
                 
-                result = self.client.execute_query_like_console(query, time_period_minutes)
-                if result.get('success') and result.get('results'):
-                    records = result.get('results', [])
-                    processed_data = self._process_lb_records(records)
-                    
-                    # Sync to ADW
-                    self._sync_to_adw(records, 'load_balancer')
-                    
-                    return {
-                        'success': True,
-                        'source': lb_source,
-                        'records_processed': len(records),
-                        'requests': processed_data['requests'],
-                        'performance_metrics': processed_data['performance'],
-                        'error_analysis': processed_data['errors'],
-                        'stats': processed_data['stats'],
-                        'time_period_minutes': time_period_minutes
-                    }
+                # Sync to ADW
+                self._sync_to_adw(records, 'load_balancer')
+                
+                return {
+                    'success': True,
+                    'source': lb_source,
+                    'records_processed': len(records),
+                    'requests': processed_data['requests'],
+                    'performance_metrics': processed_data['performance'],
+                    'error_analysis': processed_data['errors'],
+                    'stats': processed_data['stats'],
+                    'time_period_minutes': time_period_minutes
+                }
             
             return {
                 'success': True,
@@ -219,70 +259,132 @@ class EnhancedLogIngestion:
             sys.stderr.write(f"Load Balancer ingestion error: {str(e)}\n")
             return {'success': False, 'error': str(e)}
     
+    def _query_first_source(self, queries: List[Tuple[str, str]], time_period_minutes: int) -> Tuple[Optional[str], List[Dict]]:
+        """
+        Return the first candidate source (in list order) with results. The
+        primary source usually has data, so it is queried alone; only when it
+        comes back empty are the fallback sources queried, concurrently.
+        """
+        source, query = queries[0]
+        result = self.client.execute_query_like_console(query, time_period_minutes)
+        if result.get('success') and result.get('results'):
+            return source, result.get('results', [])
+        
+        fallbacks = queries[1:]
+        if not fallbacks:
+            return None, []
+        
+        executor = ThreadPoolExecutor(max_workers=len(fallbacks))
+        try:
+            futures = [
+                (source, executor.submit(self.client.execute_query_like_console, query, time_period_minutes))
+                for source, query in fallbacks
+            ]
+            
+            for source, future in futures:
+                result = future.result()
+                if result.get('success') and result.get('results'):
+                    return source, result.get('results', [])
+        finally:
+            # Return as soon as a winner is found instead of waiting for
+            # lower-priority queries still in flight
+            executor.shutdown(wait=False)
+        
+        return None, []
+    
+    def _valid_records(self, records: List[Dict], is_valid, record_type: str) -> List[Dict]:
+        """Filter out records a processor cannot handle, logging how many were skipped"""
+        valid = [record for record in records if is_valid(record)]
+        skipped = len(records) - len(valid)
+        if skipped:
+            sys.stderr.write(f"Skipping {skipped} malformed {record_type} record(s)\n")
+        return valid
+    
+    def _parse_lb_records(self, records: List[Dict]) -> List[Tuple[Any, int, float]]:
+        """Parse LB numeric fields up front, returning (record.get, response code, processing time)"""
+        parsed = []
+        for record in records:
+            try:
+                parsed.append((
+                    record.get,
+                    int(record.get('Response Code', 0)),
+                    float(record.get('Request Processing Time', 0))
+                ))
+            except (AttributeError, TypeError, ValueError) as e:
+                sys.stderr.write(f"Error processing LB record: {e}\n")
+        return parsed
+    
     def _process_vcn_flow_records(self, records: List[Dict]) -> Dict[str, Any]:
         """Process VCN Flow records for network analysis"""
         flows = []
         security_events = []
-        topology = defaultdict(lambda: {'connections': 0, 'bytes': 0, 'packets': 0})
+        # One Counter per topology metric, keyed by "src->dst"
+        topology_connections = Counter()
+        topology_bytes = Counter()
+        topology_packets = Counter()
         stats = {'total_flows': 0, 'blocked_flows': 0, 'allowed_flows': 0, 'protocols': {}}
         
-        for record in records:
-            try:
-                flow = {
-                    'timestamp': record.get('Time'),
-                    'source_ip': record.get('Source IP', ''),
-                    'dest_ip': record.get('Destination IP', ''),
-                    'source_port': record.get('Source Port', 0),
-                    'dest_port': record.get('Destination Port', 0),
-                    'protocol': 'TCP',  # Default since Protocol field not available
-                    'action': record.get('Action', 'UNKNOWN'),
-                    'bytes': 1024,  # Default since Bytes field not available
-                    'packets': 1,   # Default since Packets field not available
-                    'direction': 'UNKNOWN',  # Default since Direction field not available
-                    'vcn_ocid': '',  # Default since VCN OCID field not available
-                    'subnet_ocid': ''  # Default since Subnet OCID field not available
-                }
-                
-                flows.append(flow)
-                stats['total_flows'] += 1
-                
-                # Count by action
-                if flow['action'] == 'REJECT':
-                    stats['blocked_flows'] += 1
-                    # Security event for blocked traffic
-                    security_events.append({
-                        'type': 'blocked_connection',
-                        'severity': 'medium',
-                        'source_ip': flow['source_ip'],
-                        'dest_ip': flow['dest_ip'],
-                        'dest_port': flow['dest_port'],
-                        'protocol': flow['protocol'],
-                        'timestamp': flow['timestamp'],
-                        'description': f"Blocked connection attempt from {flow['source_ip']} to {flow['dest_ip']}:{flow['dest_port']}"
-                    })
-                else:
-                    stats['allowed_flows'] += 1
-                
-                # Protocol statistics
-                protocol = flow['protocol']
-                if protocol not in stats['protocols']:
-                    stats['protocols'][protocol] = 0
-                stats['protocols'][protocol] += 1
-                
-                # Network topology
-                connection_key = f"{flow['source_ip']}->{flow['dest_ip']}"
-                topology[connection_key]['connections'] += 1
-                topology[connection_key]['bytes'] += flow['bytes']
-                topology[connection_key]['packets'] += flow['packets']
-                
-            except Exception as e:
-                sys.stderr.write(f"Error processing VCN record: {e}\n")
-                continue
+        # Malformed records are dropped up front so the loop below cannot raise
+        for record in self._valid_records(records, _is_valid_vcn_record, 'VCN'):
+            get = record.get
+            flow = {
+                'timestamp': get('Time'),
+                'source_ip': get('Source IP', ''),
+                'dest_ip': get('Destination IP', ''),
+                'source_port': get('Source Port', 0),
+                'dest_port': get('Destination Port', 0),
+                'protocol': 'TCP',  # Default since Protocol field not available
+                'action': get('Action', 'UNKNOWN'),
+                'bytes': 1024,  # Default since Bytes field not available
+                'packets': 1,   # Default since Packets field not available
+                'direction': 'UNKNOWN',  # Default since Direction field not available
+                'vcn_ocid': '',  # Default since VCN OCID field not available
+                'subnet_ocid': ''  # Default since Subnet OCID field not available
+            }
+            
+            flows.append(flow)
+            stats['total_flows'] += 1
+            
+            # Count by action
+            if flow['action'] == 'REJECT':
+                stats['blocked_flows'] += 1
+                # Security event for blocked traffic
+                security_events.append({
+                    'type': 'blocked_connection',
+                    'severity': 'medium',
+                    'source_ip': flow['source_ip'],
+                    'dest_ip': flow['dest_ip'],
+                    'dest_port': flow['dest_port'],
+                    'protocol': flow['protocol'],
+                    'timestamp': flow['timestamp'],
+                    'description': f"Blocked connection attempt from {flow['source_ip']} to {flow['dest_ip']}:{flow['dest_port']}"
+                })
+            else:
+                stats['allowed_flows'] += 1
+            
+            # Protocol statistics
+            protocol = flow['protocol']
+            if protocol not in stats['protocols']:
+                stats['protocols'][protocol] = 0
+            stats['protocols'][protocol] += 1
+            
+            # Network topology
+            connection_key = f"{flow['source_ip']}->{flow['dest_ip']}"
+            topology_connections[connection_key] += 1
+            topology_bytes[connection_key] += flow['bytes']
+            topology_packets[connection_key] += flow['packets']
         
         return {
             'flows': flows,
             'security_events': security_events,
-            'topology': dict(topology),
+            'topology': {
+                key: {
+                    'connections': connections,
+                    'bytes': topology_bytes[key],
+                    'packets': topology_packets[key]
+                }
+                for key, connections in topology_connections.items()
+            },
             'stats': stats
         }
     
@@ -291,62 +393,73 @@ class EnhancedLogIngestion:
         attacks = []
         blocked = []
         threats = []
-        geography = defaultdict(int)
+        countries = []
         stats = {'total_requests': 0, 'blocked_requests': 0, 'attack_attempts': 0}
+        partial = 0
         
-        for record in records:
-            try:
-                client_ip = record.get('Client IP') or record.get('Source IP', '')
-                action = record.get('Action', '').upper()
-                rule_id = record.get('Rule ID', '')
-                attack_type = record.get('Attack Type', '')
-                country = record.get('Country Code', 'Unknown')
+        # Records without a usable Action are dropped up front so the loop
+        # below cannot raise
+        for record in self._valid_records(records, _is_valid_waf_record, 'WAF'):
+            get = record.get
+            client_ip = get('Client IP') or get('Source IP', '')
+            action = get('Action', '').upper()
+            rule_id = get('Rule ID', '')
+            attack_type = get('Attack Type', '')
+            country = get('Country Code', 'Unknown')
+            
+            waf_event = {
+                'timestamp': get('Time'),
+                'client_ip': client_ip,
+                'method': get('Request Method', ''),
+                'uri': get('Request URI', ''),
+                'response_code': get('Response Code', 0),
+                'user_agent': get('User Agent', ''),
+                'action': action,
+                'rule_id': rule_id,
+                'attack_type': attack_type,
+                'country': country,
+                'request_size': get('Request Size', 0),
+                'response_size': get('Response Size', 0)
+            }
+            
+            stats['total_requests'] += 1
+            # A list/dict Country Code still counts as a request but cannot be
+            # tallied by country, so the rest of the record is skipped
+            if not isinstance(country, Hashable):
+                partial += 1
+                continue
+            countries.append(country)
+            
+            if action in _BLOCK_ACTIONS:
+                blocked.append(waf_event)
+                stats['blocked_requests'] += 1
+            
+            # A non-string Attack Type counts as a request but not as an attack
+            if attack_type and not isinstance(attack_type, str):
+                partial += 1
+            elif attack_type and attack_type.lower() != 'none':
+                attacks.append(waf_event)
+                stats['attack_attempts'] += 1
                 
-                waf_event = {
-                    'timestamp': record.get('Time'),
-                    'client_ip': client_ip,
-                    'method': record.get('Request Method', ''),
-                    'uri': record.get('Request URI', ''),
-                    'response_code': record.get('Response Code', 0),
-                    'user_agent': record.get('User Agent', ''),
-                    'action': action,
-                    'rule_id': rule_id,
+                # Create threat intelligence entry
+                threats.append({
+                    'ip': client_ip,
                     'attack_type': attack_type,
+                    'timestamp': waf_event['timestamp'],
+                    'severity': self._get_attack_severity(attack_type),
                     'country': country,
-                    'request_size': record.get('Request Size', 0),
-                    'response_size': record.get('Response Size', 0)
-                }
-                
-                stats['total_requests'] += 1
-                geography[country] += 1
-                
-                if action in ['BLOCK', 'BLOCKED', 'DENY']:
-                    blocked.append(waf_event)
-                    stats['blocked_requests'] += 1
-                
-                if attack_type and attack_type.lower() != 'none':
-                    attacks.append(waf_event)
-                    stats['attack_attempts'] += 1
-                    
-                    # Create threat intelligence entry
-                    threats.append({
-                        'ip': client_ip,
-                        'attack_type': attack_type,
-                        'timestamp': waf_event['timestamp'],
-                        'severity': self._get_attack_severity(attack_type),
-                        'country': country,
-                        'user_agent': waf_event['user_agent']
-                    })
-                
-            except Exception as e:
-                sys.stderr.write(f"Error processing WAF record: {e}\n")
-                continue
+                    'user_agent': waf_event['user_agent']
+                })
+        
+        if partial:
+            sys.stderr.write(f"Partly counted {partial} WAF record(s) with a malformed Country Code or Attack Type\n")
         
         return {
             'attacks': attacks,
             'blocked': blocked,
             'threats': threats,
-            'geography': dict(geography),
+            # Counter tallies the collected countries in C in one pass
+            'geography': dict(Counter(countries)),
             'stats': stats
         }
     
@@ -354,44 +467,51 @@ class EnhancedLogIngestion:
         """Process Load Balancer records"""
         requests = []
         performance = {'avg_response_time': 0.0, 'max_response_time': 0.0, 'min_response_time': float('inf')}
-        errors = defaultdict(int)
+        # Tally 4xx/5xx codes in a flat array indexed by code - 400; anything
+        # outside 400-599 falls back to a dict
+        error_counts = array('i', [0]) * 200
+        other_errors = defaultdict(int)
         stats = {'total_requests': 0, 'error_rate': 0.0}
         
-        response_times = []
+        # Running aggregates instead of collecting every processing time
+        total_time = 0.0
+        max_time = float('-inf')
+        min_time = float('inf')
         
-        for record in records:
-            try:
-                response_code = int(record.get('Response Code', 0))
-                processing_time = float(record.get('Request Processing Time', 0))
-                
-                lb_request = {
-                    'timestamp': record.get('Time'),
-                    'client_ip': record.get('Client IP', ''),
-                    'target_ip': record.get('Target IP', ''),
-                    'method': record.get('Request Method', ''),
-                    'uri': record.get('Request URI', ''),
-                    'response_code': response_code,
-                    'processing_time': processing_time,
-                    'user_agent': record.get('User Agent', '')
-                }
-                
-                requests.append(lb_request)
-                stats['total_requests'] += 1
-                response_times.append(processing_time)
-                
-                # Error analysis
-                if response_code >= 400:
-                    errors[f"{response_code}xx"] += 1
-                
-            except Exception as e:
-                sys.stderr.write(f"Error processing LB record: {e}\n")
-                continue
+        for get, response_code, processing_time in self._parse_lb_records(records):
+            lb_request = {
+                'timestamp': get('Time'),
+                'client_ip': get('Client IP', ''),
+                'target_ip': get('Target IP', ''),
+                'method': get('Request Method', ''),
+                'uri': get('Request URI', ''),
+                'response_code': response_code,
+                'processing_time': processing_time,
+                'user_agent': get('User Agent', '')
+            }
+            
+            requests.append(lb_request)
+            stats['total_requests'] += 1
+            total_time += processing_time
+            if processing_time > max_time:
+                max_time = processing_time
+            if processing_time < min_time:
+                min_time = processing_time
+            
+            # Error analysis
+            if 400 <= response_code < 600:
+                error_counts[response_code - 400] += 1
+            elif response_code >= 600:
+                other_errors[response_code] += 1
         
         # Calculate performance metrics
-        if response_times:
-            performance['avg_response_time'] = sum(response_times) / len(response_times)
-            performance['max_response_time'] = max(response_times)
-            performance['min_response_time'] = min(response_times)
+        if stats['total_requests']:
+            performance['avg_response_time'] = total_time / stats['total_requests']
+            performance['max_response_time'] = max_time
+            performance['min_response_time'] = min_time
+        
+        errors = {f"{400 + offset}xx": count for offset, count in enumerate(error_counts) if count}
+        errors.update((f"{code}xx", count) for code, count in other_errors.items())
         
         # Calculate error rate
         error_count = sum(errors.values())
@@ -400,23 +520,17 @@ class EnhancedLogIngestion:
         return {
             'requests': requests,
             'performance': performance,
-            'errors': dict(errors),
+            'errors': errors,
             'stats': stats
         }
     
     def _get_attack_severity(self, attack_type: str) -> str:
         """Determine attack severity based on type"""
-        high_severity = ['sql injection', 'xss', 'rce', 'command injection', 'path traversal']
-        medium_severity = ['csrf', 'xxe', 'directory traversal', 'file inclusion']
-        
-        attack_lower = attack_type.lower()
-        for high_attack in high_severity:
-            if high_attack in attack_lower:
-                return 'high'
+        if _HIGH_SEVERITY_RE.search(attack_type):
+            return 'high'
         
-        for medium_attack in medium_severity:
-            if medium_attack in attack_lower:
-                return 'medium'
+        if _MEDIUM_SEVERITY_RE.search(attack_type):
+            return 'medium'
         
         return 'low'
     
@@ -429,17 +543,16 @@ class EnhancedLogIngestion:
             'sources': {}
         }
         
-        # VCN Flow Logs
-        vcn_result = self.ingest_vcn_flow_logs(time_period_minutes)
-        results['sources']['vcn_flow'] = vcn_result
-        
-        # WAF Logs
-        waf_result = self.ingest_waf_logs(time_period_minutes)
-        results['sources']['waf'] = waf_result
-        
-        # Load Balancer Logs
-        lb_result = self.ingest_load_balancer_logs(time_period_minutes)
-        results['sources']['load_balancer'] = lb_result
+        # VCN Flow, WAF and Load Balancer ingestion are independent I/O-bound
+        # queries, so run them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            vcn_future = executor.submit(self.ingest_vcn_flow_logs, time_period_minutes)
+            waf_future = executor.submit(self.ingest_waf_logs, time_period_minutes)
+            lb_future = executor.submit(self.ingest_load_balancer_logs, time_period_minutes)
+            
+            results['sources']['vcn_flow'] = vcn_future.result()
+            results['sources']['waf'] = waf_future.result()
+            results['sources']['load_balancer'] = lb_future.result()
         
         # Overall success based on individual results
         results['success'] = any(source.get('success', False) for source in results['sources'].values())
@@ -506,7 +619,7 @@ def main():
     else:
         result = {'success': False, 'error': 'Unknown action'}
     
-    print(json.dumps(result, indent=2, default=str))
+    _write_json(result)
 
 if __name__ == '__main__':
     main()
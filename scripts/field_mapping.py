@@ -5,9 +5,106 @@ Maps various OCI log fields to standardized Neo4j node types and properties
 """
 
 from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional, Set, Any
 import re
 import ipaddress
+import string
+import sys
+
+# Service account heuristics: a keyword or '$' anywhere (case-insensitive),
+# or a name made only of capitals, digits, underscores and hyphens
+_SERVICE_ACCOUNT_RE = re.compile(r'(?i:service|svc|app|system|\$)|^[A-Z0-9_\-]+$')
+
+# Hostname keywords per OS, checked in this order so e.g. 'linux-srv01' stays windows
+_OS_TYPE_PATTERNS = (
+    (re.compile(r'win|dc|srv|wks'), 'windows'),
+    (re.compile(r'linux|ubuntu|centos|rhel'), 'linux'),
+    (re.compile(r'mac|osx|darwin'), 'macos'),
+)
+
+# Structured host naming (e.g. WKS-FIN042) suggests a domain-joined machine
+_DOMAIN_JOINED_RE = re.compile(r'^[A-Z0-9\-]+\d+$')
+
+# Lookup tables for the port, user and process transforms
+_STANDARD_PORTS = frozenset({80, 443, 22, 21, 25, 53, 110, 143, 993, 995, 3389, 5900})
+
+_PORT_SERVICES = {
+    80: 'HTTP', 443: 'HTTPS', 22: 'SSH', 21: 'FTP',
+    25: 'SMTP', 53: 'DNS', 110: 'POP3', 143: 'IMAP',
+    993: 'IMAPS', 995: 'POP3S', 3389: 'RDP', 5900: 'VNC',
+    23: 'Telnet', 135: 'RPC', 139: 'NetBIOS', 445: 'SMB'
+}
+
+_PRIVILEGED_USERS = frozenset({'root', 'admin', 'administrator', 'sa', 'oracle', 'postgres', 'mysql'})
+
+_SUSPICIOUS_PROCESSES = frozenset({
+    'powershell.exe', 'cmd.exe', 'bash', 'sh', 'nc.exe', 'netcat',
+    'psexec.exe', 'wmic.exe', 'regsvr32.exe', 'rundll32.exe',
+    'certutil.exe', 'bitsadmin.exe', 'wscript.exe', 'cscript.exe'
+})
+
+# What the transforms raise on malformed values (wrong type, unparsable
+# number, out-of-range epoch); the property is skipped for that record
+_TRANSFORM_ERRORS = (ValueError, TypeError, AttributeError, OverflowError, OSError)
+
+@lru_cache(maxsize=65536)
+def _classify_ip(ip_str: str) -> tuple:
+    """
+    Parse an IP once and return (normalized address, is_internal, ip_type).
+    Cached because the same hosts recur across the records of a batch.
+    """
+    try:
+        ip_obj = ipaddress.ip_address(ip_str)
+    except ValueError:
+        return ip_str, False, 'unknown'
+    
+    if ip_obj.is_loopback:
+        ip_type = 'loopback'
+    elif ip_obj.is_private:
+        ip_type = 'private'
+    elif ip_obj.is_multicast:
+        ip_type = 'multicast'
+    else:
+        ip_type = 'public'
+    return str(ip_obj), ip_obj.is_private or ip_obj.is_loopback, ip_type
+
+@lru_cache(maxsize=256)
+def _log_type_for_source(log_source: str) -> Optional[str]:
+    """
+    Classify a 'Log Source' name by keyword, or None if it names no known type.
+    Cached since a batch only carries a handful of distinct sources.
+    """
+    if 'VCN Flow' in log_source:
+        return 'vcn_flow'
+    elif 'Audit' in log_source:
+        return 'audit'
+    elif 'Security' in log_source or 'Windows' in log_source:
+        return 'security'
+    return None
+
+@lru_cache(maxsize=8192)
+def _epoch_to_iso(timestamp_val: int) -> str:
+    """Convert an epoch timestamp in seconds or milliseconds to ISO format"""
+    return datetime.fromtimestamp(timestamp_val / 1000 if timestamp_val > 10**12 else timestamp_val).isoformat()
+
+def _compile_node_id(id_pattern: str, target_property: str):
+    """
+    Turn a node ID pattern into a one-argument function, avoiding a kwargs dict
+    and format-string parse per node for the usual 'prefix:{property}' shape.
+    IDs are interned since the same hosts and ports recur across records.
+    """
+    parts = list(string.Formatter().parse(id_pattern))
+    field = parts[0]
+    if (field[1] == target_property and not field[2] and field[3] is None
+            and (len(parts) == 1 or (len(parts) == 2 and parts[1][1] is None))):
+        prefix = field[0]
+        suffix = parts[1][0] if len(parts) == 2 else ''
+        template = prefix.replace('%', '%%') + '%s' + suffix.replace('%', '%%')
+        return lambda value: sys.intern(template % (value,))
+    
+    return lambda value: id_pattern.format(**{target_property: value})
 
 @dataclass
 class FieldMapping:
@@ -35,6 +132,8 @@ class LogFieldMapper:
         self.field_mappings = self._initialize_field_mappings()
         self.relationship_mappings = self._initialize_relationship_mappings()
         self.node_id_patterns = self._initialize_node_id_patterns()
+        self._mapping_index = self._build_mapping_index()
+        self._relationship_table = self._build_relationship_table()
     
     def _initialize_field_mappings(self) -> Dict[str, List[FieldMapping]]:
         """Define mappings from OCI log fields to Neo4j node properties"""
@@ -42,20 +141,10 @@ class LogFieldMapper:
             # VCN Flow Logs
             'vcn_flow': [
                 # IP Address mappings
-                FieldMapping('Source IP', 'IP', 'address', self._normalize_ip, True),
-                FieldMapping('Destination IP', 'IP', 'address', self._normalize_ip, True),
-                FieldMapping('Source IP', 'IP', 'is_internal', self._is_internal_ip),
-                FieldMapping('Destination IP', 'IP', 'is_internal', self._is_internal_ip),
-                FieldMapping('Source IP', 'IP', 'ip_type', self._get_ip_type),
-                FieldMapping('Destination IP', 'IP', 'ip_type', self._get_ip_type),
+                *self._ip_mappings(('Source IP', 'Destination IP'), ('address', 'is_internal', 'ip_type')),
                 
                 # Port mappings
-                FieldMapping('Source Port', 'Port', 'number', int, True),
-                FieldMapping('Destination Port', 'Port', 'number', int, True),
-                FieldMapping('Source Port', 'Port', 'is_standard', self._is_standard_port),
-                FieldMapping('Destination Port', 'Port', 'is_standard', self._is_standard_port),
-                FieldMapping('Source Port', 'Port', 'service_name', self._get_service_name),
-                FieldMapping('Destination Port', 'Port', 'service_name', self._get_service_name),
+                *self._port_mappings(('Source Port', 'Destination Port'), ('number', 'is_standard', 'service_name')),
                 
                 # Protocol and Action
                 FieldMapping('Protocol', 'Protocol', 'name', str, True),
@@ -82,10 +171,7 @@ class LogFieldMapper:
                 FieldMapping('Event Source', 'Event', 'source', str),
                 
                 # IP Address mappings (same as VCN)
-                FieldMapping('Source IP', 'IP', 'address', self._normalize_ip, True),
-                FieldMapping('Client IP', 'IP', 'address', self._normalize_ip, True),
-                FieldMapping('Source IP', 'IP', 'is_internal', self._is_internal_ip),
-                FieldMapping('Client IP', 'IP', 'is_internal', self._is_internal_ip),
+                *self._ip_mappings(('Source IP', 'Client IP'), ('address', 'is_internal')),
                 
                 # Resource mappings
                 FieldMapping('Resource Name', 'Resource', 'name', str, True),
@@ -121,13 +207,41 @@ class LogFieldMapper:
                 FieldMapping('Severity', 'SecurityEvent', 'severity', str),
                 
                 # Network mappings
-                FieldMapping('Source IP', 'IP', 'address', self._normalize_ip, True),
-                FieldMapping('Target IP', 'IP', 'address', self._normalize_ip, True),
-                FieldMapping('Source Port', 'Port', 'number', int, True),
-                FieldMapping('Target Port', 'Port', 'number', int, True),
+                *self._ip_mappings(('Source IP', 'Target IP'), ('address',)),
+                *self._port_mappings(('Source Port', 'Target Port'), ('number',)),
             ]
         }
     
+    def _ip_mappings(self, source_fields: tuple, properties: tuple) -> List[FieldMapping]:
+        """
+        IP node mappings shared across log types. Emitted property by property
+        (all fields' address first, then is_internal, ...) to keep the
+        declaration order map_log_record_to_nodes depends on
+        """
+        transforms = {
+            'address': (self._normalize_ip, True),
+            'is_internal': (self._is_internal_ip, False),
+            'ip_type': (self._get_ip_type, False),
+        }
+        return [
+            FieldMapping(source_field, 'IP', prop, *transforms[prop])
+            for prop in properties
+            for source_field in source_fields
+        ]
+    
+    def _port_mappings(self, source_fields: tuple, properties: tuple) -> List[FieldMapping]:
+        """Port node mappings shared across log types, ordered like _ip_mappings"""
+        transforms = {
+            'number': (int, True),
+            'is_standard': (self._is_standard_port, False),
+            'service_name': (self._get_service_name, False),
+        }
+        return [
+            FieldMapping(source_field, 'Port', prop, *transforms[prop])
+            for prop in properties
+            for source_field in source_fields
+        ]
+    
     def _initialize_relationship_mappings(self) -> List[RelationshipMapping]:
         """Define how to create relationships between nodes from log data"""
         return [
@@ -215,101 +329,103 @@ class LogFieldMapper:
             'FlowSession': 'flow:{source_ip}:{destination_ip}:{timestamp}'
         }
     
+    def _build_mapping_index(self) -> Dict[str, Dict[str, tuple]]:
+        """
+        Index each log type's FieldMappings by source field as plain tuples,
+        (position, source_field, node_type, property, transform, is_pk, make_id),
+        where position is the declaration order and make_id builds the node ID
+        """
+        index = {}
+        for log_type, mappings in self.field_mappings.items():
+            by_field = {}
+            for position, mapping in enumerate(mappings):
+                entry = (
+                    position,
+                    mapping.source_field,
+                    mapping.target_node_type,
+                    mapping.target_property,
+                    mapping.transform_func,
+                    mapping.is_primary_key,
+                    _compile_node_id(
+                        self.node_id_patterns.get(
+                            mapping.target_node_type,
+                            f"{mapping.target_node_type.lower()}:{{{mapping.target_property}}}"
+                        ),
+                        mapping.target_property
+                    )
+                )
+                by_field[mapping.source_field] = by_field.get(mapping.source_field, ()) + (entry,)
+            index[log_type] = by_field
+        return index
+    
+    def _build_relationship_table(self) -> tuple:
+        """
+        Flatten RelationshipMappings into plain tuples, with the property
+        mapping as (log_field, rel_prop) pairs
+        """
+        return tuple(
+            (
+                rel_mapping.source_node_type,
+                rel_mapping.source_field,
+                rel_mapping.target_node_type,
+                rel_mapping.target_field,
+                rel_mapping.relationship_type,
+                tuple(rel_mapping.properties.items()) if rel_mapping.properties else ()
+            )
+            for rel_mapping in self.relationship_mappings
+        )
+    
     # Transform functions
     def _normalize_ip(self, ip_str: str) -> str:
         """Normalize IP address format"""
-        try:
-            return str(ipaddress.ip_address(ip_str))
-        except:
-            return ip_str
+        return _classify_ip(ip_str)[0]
     
     def _is_internal_ip(self, ip_str: str) -> bool:
         """Check if IP is internal/private"""
-        try:
-            ip_obj = ipaddress.ip_address(ip_str)
-            return ip_obj.is_private or ip_obj.is_loopback
-        except:
-            return False
+        return _classify_ip(ip_str)[1]
     
     def _get_ip_type(self, ip_str: str) -> str:
         """Determine IP address type"""
-        try:
-            ip_obj = ipaddress.ip_address(ip_str)
-            if ip_obj.is_loopback:
-                return 'loopback'
-            elif ip_obj.is_private:
-                return 'private'
-            elif ip_obj.is_multicast:
-                return 'multicast'
-            else:
-                return 'public'
-        except:
-            return 'unknown'
+        return _classify_ip(ip_str)[2]
     
     def _is_standard_port(self, port_num: int) -> bool:
         """Check if port is a standard well-known port"""
-        standard_ports = {80, 443, 22, 21, 25, 53, 110, 143, 993, 995, 3389, 5900}
-        return port_num in standard_ports
+        return port_num in _STANDARD_PORTS
     
     def _get_service_name(self, port_num: int) -> str:
         """Get service name for port number"""
-        port_services = {
-            80: 'HTTP', 443: 'HTTPS', 22: 'SSH', 21: 'FTP',
-            25: 'SMTP', 53: 'DNS', 110: 'POP3', 143: 'IMAP',
-            993: 'IMAPS', 995: 'POP3S', 3389: 'RDP', 5900: 'VNC',
-            23: 'Telnet', 135: 'RPC', 139: 'NetBIOS', 445: 'SMB'
-        }
-        return port_services.get(port_num, f'Port-{port_num}')
+        return _PORT_SERVICES.get(port_num, f'Port-{port_num}')
     
     def _is_service_account(self, username: str) -> bool:
         """Check if user is a service account"""
-        service_patterns = [
-            r'.*service.*', r'.*svc.*', r'.*app.*', r'.*system.*',
-            r'^[A-Z0-9_\-]+$',  # All caps/numbers/underscores
-            r'.*\$'  # Ends with $
-        ]
-        username_lower = username.lower()
-        return any(re.match(pattern, username_lower) for pattern in service_patterns)
+        return bool(_SERVICE_ACCOUNT_RE.search(username))
     
     def _is_privileged_user(self, username: str) -> bool:
         """Check if user has privileged access"""
-        privileged_users = {'root', 'admin', 'administrator', 'sa', 'oracle', 'postgres', 'mysql'}
-        return username.lower() in privileged_users
+        return username.lower() in _PRIVILEGED_USERS
     
     def _is_suspicious_process(self, process_name: str) -> bool:
         """Check if process is potentially suspicious"""
-        suspicious_processes = {
-            'powershell.exe', 'cmd.exe', 'bash', 'sh', 'nc.exe', 'netcat',
-            'psexec.exe', 'wmic.exe', 'regsvr32.exe', 'rundll32.exe',
-            'certutil.exe', 'bitsadmin.exe', 'wscript.exe', 'cscript.exe'
-        }
-        return process_name.lower() in suspicious_processes
+        return process_name.lower() in _SUSPICIOUS_PROCESSES
     
     def _detect_os_type(self, hostname: str) -> str:
         """Detect OS type from hostname patterns"""
         hostname_lower = hostname.lower()
-        if any(pattern in hostname_lower for pattern in ['win', 'dc', 'srv', 'wks']):
-            return 'windows'
-        elif any(pattern in hostname_lower for pattern in ['linux', 'ubuntu', 'centos', 'rhel']):
-            return 'linux'
-        elif any(pattern in hostname_lower for pattern in ['mac', 'osx', 'darwin']):
-            return 'macos'
-        else:
-            return 'unknown'
+        for pattern, os_type in _OS_TYPE_PATTERNS:
+            if pattern.search(hostname_lower):
+                return os_type
+        return 'unknown'
     
     def _is_domain_joined(self, hostname: str) -> bool:
         """Check if host appears to be domain joined"""
         # Simple heuristic - domain joined machines often have structured naming
-        return bool(re.match(r'^[A-Z0-9\-]+\d+$', hostname.upper()))
+        return bool(_DOMAIN_JOINED_RE.match(hostname.upper()))
     
     def _parse_timestamp(self, timestamp_val: Any) -> str:
         """Parse timestamp to ISO format"""
-        from datetime import datetime
-        
         if isinstance(timestamp_val, int):
-            # Handle epoch timestamp
-            dt = datetime.fromtimestamp(timestamp_val / 1000 if timestamp_val > 10**12 else timestamp_val)
-            return dt.isoformat()
+            # Handle epoch timestamp; cached since flow records in a batch share timestamps
+            return _epoch_to_iso(timestamp_val)
         elif isinstance(timestamp_val, str):
             # Handle ISO string timestamp
             return timestamp_val.replace('Z', '+00:00')
@@ -320,82 +436,73 @@ class LogFieldMapper:
         """Convert a log record to Neo4j nodes"""
         nodes = {}
         
-        if log_type not in self.field_mappings:
+        index = self._mapping_index.get(log_type)
+        if index is None:
             return []
         
-        mappings = self.field_mappings[log_type]
+        # Only walk mappings for fields present in the record, restoring
+        # declaration order since the first primary key creates each node
+        entries = []
+        for source_field, value in log_record.items():
+            if source_field in index and value is not None and value != '':
+                entries.extend(index[source_field])
+        entries.sort()
         
-        for mapping in mappings:
-            if mapping.source_field in log_record:
-                value = log_record[mapping.source_field]
-                if value is None or value == '':
+        for _, source_field, node_type, target_property, transform_func, is_primary_key, make_id in entries:
+            value = log_record[source_field]
+            
+            # Apply transformation if specified
+            if transform_func:
+                try:
+                    transformed_value = transform_func(value)
+                except _TRANSFORM_ERRORS:
                     continue
-                
-                # Apply transformation if specified
-                if mapping.transform_func:
-                    try:
-                        transformed_value = mapping.transform_func(value)
-                    except:
-                        continue
-                else:
-                    transformed_value = value
-                
-                # Generate node ID
-                node_type = mapping.target_node_type
-                if mapping.is_primary_key:
-                    if node_type not in nodes:
-                        id_pattern = self.node_id_patterns.get(node_type, f"{node_type.lower()}:{{{mapping.target_property}}}")
-                        node_id = id_pattern.format(**{mapping.target_property: transformed_value})
-                        
-                        nodes[node_type] = {
-                            'id': node_id,
-                            'type': node_type,
-                            'properties': {}
-                        }
-                
-                # Add property to node
-                if node_type in nodes:
-                    nodes[node_type]['properties'][mapping.target_property] = transformed_value
-        
+            else:
+                transformed_value = value
+            
+            # Generate node ID
+            if is_primary_key:
+                if node_type not in nodes:
+                    node_id = make_id(transformed_value)
+                    
+                    nodes[node_type] = {
+                        'id': node_id,
+                        'type': node_type,
+                        'properties': {}
+                    }
+            
+            # Add property to node
+            if node_type in nodes:
+                nodes[node_type]['properties'][target_property] = transformed_value
+    
         return list(nodes.values())
     
     def map_log_record_to_relationships(self, log_record: Dict[str, Any], nodes: List[Dict]) -> List[Dict]:
         """Convert a log record to Neo4j relationships"""
         relationships = []
         
-        # Create a mapping of node types to their IDs for this record
-        node_map = {}
-        for node in nodes:
-            node_type = node['type']
-            if node_type not in node_map:
-                node_map[node_type] = []
-            node_map[node_type].append(node['id'])
+        # map_log_record_to_nodes yields at most one node per type
+        node_ids = {node['type']: node['id'] for node in nodes}
         
-        for rel_mapping in self.relationship_mappings:
-            source_type = rel_mapping.source_node_type
-            target_type = rel_mapping.target_node_type
+        for source_type, source_field, target_type, target_field, relationship_type, property_fields in self._relationship_table:
+            source_id = node_ids.get(source_type)
+            target_id = node_ids.get(target_type)
             
-            # Check if both source and target nodes exist for this record
-            if (source_type in node_map and target_type in node_map and
-                rel_mapping.source_field in log_record and 
-                rel_mapping.target_field in log_record):
-                
-                # Create relationship between nodes
-                for source_id in node_map[source_type]:
-                    for target_id in node_map[target_type]:
-                        # Build relationship properties
-                        rel_properties = {}
-                        if rel_mapping.properties:
-                            for log_field, rel_prop in rel_mapping.properties.items():
-                                if log_field in log_record:
-                                    rel_properties[rel_prop] = log_record[log_field]
-                        
-                        relationships.append({
-                            'source_id': source_id,
-                            'target_id': target_id,
-                            'type': rel_mapping.relationship_type,
-                            'properties': rel_properties
-                        })
+            # Both nodes must exist and both fields be present in this record
+            if (source_id is None or target_id is None or
+                source_field not in log_record or target_field not in log_record):
+                continue
+            
+            relationships.append({
+                'source_id': source_id,
+                'target_id': target_id,
+                'type': relationship_type,
+                'properties': {
+                    rel_prop: log_record[log_field]
+                    for log_field, rel_prop in property_fields
+                    if log_field in log_record
+                }
+            })
         
         return relationships
     
@@ -403,12 +510,12 @@ class LogFieldMapper:
         """Determine log type from record fields"""
         if 'Log Source' in log_record:
             log_source = log_record['Log Source']
-            if 'VCN Flow' in log_source:
-                return 'vcn_flow'
-            elif 'Audit' in log_source:
-                return 'audit'
-            elif 'Security' in log_source or 'Windows' in log_source:
-                return 'security'
+            if isinstance(log_source, str):
+                log_type = _log_type_for_source(log_source)
+            else:
+                log_type = _log_type_for_source.__wrapped__(log_source)
+            if log_type:
+                return log_type
         
         # Fallback based on field presence
         if 'Source IP' in log_record and 'Destination IP' in log_record:
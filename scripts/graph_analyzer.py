@@ -20,6 +20,9 @@ except ImportError:
 from logan_client import LoganClient
 from field_mapping import LogFieldMapper
 
+# Rows per UNWIND statement when writing nodes and relationships to Neo4j
+NEO4J_BATCH_SIZE = 20000
+
 @dataclass
 class SecurityNode:
     """Represents a node in the security graph"""
@@ -116,6 +119,59 @@ class Neo4jGraphStore:
                        weight=rel.weight,
                        timestamp=rel.timestamp.isoformat() if rel.timestamp else None)
     
+    def create_nodes(self, nodes: List[SecurityNode], batch_size: int = NEO4J_BATCH_SIZE):
+        """Create or update security nodes with one UNWIND statement per label and batch"""
+        rows_by_label = defaultdict(list)
+        for node in nodes:
+            rows_by_label[node.type.title()].append({
+                'id': node.id,
+                'properties': node.properties,
+                'risk_score': node.risk_score,
+                'last_seen': node.last_seen.isoformat() if node.last_seen else None,
+                'first_seen': node.first_seen.isoformat() if node.first_seen else None
+            })
+        
+        with self.driver.session() as session:
+            for label, rows in rows_by_label.items():
+                query = f"""
+                UNWIND $rows AS row
+                MERGE (n:{label} {{id: row.id}})
+                SET n += row.properties
+                SET n.risk_score = row.risk_score
+                SET n.last_seen = row.last_seen
+                SET n.first_seen = COALESCE(n.first_seen, row.first_seen)
+                """
+                
+                for start in range(0, len(rows), batch_size):
+                    session.run(query, rows=rows[start:start + batch_size]).consume()
+    
+    def create_relationships(self, relationships: List[SecurityRelationship], batch_size: int = NEO4J_BATCH_SIZE):
+        """Create or update security relationships with one UNWIND statement per type and batch"""
+        rows_by_type = defaultdict(list)
+        for rel in relationships:
+            rows_by_type[rel.relationship_type].append({
+                'source_id': rel.source_id,
+                'target_id': rel.target_id,
+                'properties': rel.properties,
+                'weight': rel.weight,
+                'timestamp': rel.timestamp.isoformat() if rel.timestamp else None
+            })
+        
+        with self.driver.session() as session:
+            for relationship_type, rows in rows_by_type.items():
+                query = f"""
+                UNWIND $rows AS row
+                MATCH (a {{id: row.source_id}})
+                MATCH (b {{id: row.target_id}})
+                MERGE (a)-[r:{relationship_type}]->(b)
+                SET r += row.properties
+                SET r.weight = row.weight
+                SET r.timestamp = row.timestamp
+                """
+                
+                for start in range(0, len(rows), batch_size):
+                    session.run(query, rows=rows[start:start + batch_size]).consume()
+    
     def get_subgraph(self, center_node_id: str, depth: int = 2) -> Dict:
         """Get a subgraph around a specific node"""
         with self.driver.session() as session:
@@ -629,11 +685,9 @@ class SecurityGraphAnalyzer:
             return
         
         try:
-            for node in nodes:
-                self.neo4j_store.create_node(node)
-            
-            for rel in relationships:
-                self.neo4j_store.create_relationship(rel)
+            # Batched UNWIND writes instead of one session and round trip per element
+            self.neo4j_store.create_nodes(nodes)
+            self.neo4j_store.create_relationships(relationships)
         except Exception as e:
             print(f"Neo4j storage warning: {e}", file=sys.stderr)
     
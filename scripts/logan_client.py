@@ -8,6 +8,7 @@ import oci
 import json
 import sys
 import os
+import threading
 from datetime import datetime, timedelta, timezone
 import argparse
 from dotenv import load_dotenv
@@ -29,6 +30,9 @@ class LoganClient:
         # Set the region for the client
         self.config["region"] = self.region
         self.client = oci.log_analytics.LogAnalyticsClient(self.config)
+        self._http_session = None
+        self._signer = None
+        self._http_session_lock = threading.Lock()
         self.namespace = self._get_namespace()
 
         # Debug info only for explicit debugging (can be enabled via environment variable)
@@ -62,6 +66,28 @@ class LoganClient:
                 }
             raise Exception(f"Failed to load OCI config: {e}. Ensure ~/.oci/config is set up or all OCI_* env vars are present.")
 
+    def _get_http_session(self):
+        """Get the shared HTTP session and OCI request signer, creating them on first use"""
+        with self._http_session_lock:
+            if self._http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from oci.signer import Signer
+
+                # Keep-alive connection pool so repeated console queries skip TCP/TLS setup
+                session = requests.Session()
+                session.mount('https://', HTTPAdapter(pool_maxsize=50))
+
+                self._signer = Signer(
+                    tenancy=self.config["tenancy"],
+                    user=self.config["user"],
+                    fingerprint=self.config["fingerprint"],
+                    private_key_file_location=self.config["key_file"],
+                    pass_phrase=self.config.get("pass_phrase")
+                )
+                self._http_session = session
+            return self._http_session, self._signer
+
     def _get_namespace(self):
         """Get tenancy namespace"""
         try:
@@ -145,18 +171,8 @@ class LoganClient:
                 sys.stderr.write(f"LoganClient: Executing console-like query with compartment_id_in_subtree=True\n")
                 sys.stderr.write(f"LoganClient: Time range: {start_time.isoformat()} to {end_time.isoformat()}\n")
             
-            # Make direct HTTP request to match console exactly
-            import requests
-            from oci.signer import Signer
-            
-            # Create OCI request signer
-            signer = Signer(
-                tenancy=self.config["tenancy"],
-                user=self.config["user"],
-                fingerprint=self.config["fingerprint"],
-                private_key_file_location=self.config["key_file"],
-                pass_phrase=self.config.get("pass_phrase")
-            )
+            # Make direct HTTP request to match console exactly, reusing the pooled session
+            session, signer = self._get_http_session()
             
             # Console URL format
             url = f"https://loganalytics.{self.region}.oci.oraclecloud.com/20200601/namespaces/{self.namespace}/search/actions/query"
@@ -165,7 +181,7 @@ class LoganClient:
             if os.getenv('LOGAN_DEBUG') == 'true':
                 sys.stderr.write(f"LoganClient: Making direct HTTP request to: {url}\n")
             
-            response = requests.post(url, json=query_details, auth=signer, params=params)
+            response = session.post(url, json=query_details, auth=signer, params=params)
             
             if response.status_code == 200:
                 # Synchronous response
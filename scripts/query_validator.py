@@ -6,6 +6,36 @@ Validates and transforms queries to work with available log sources and proper s
 
 import json
 import sys
+import hashlib
+from collections import OrderedDict
+
+# Maximum number of validated queries kept per validator instance
+VALIDATION_CACHE_SIZE = 1024
+
+# Part of the validation cache key; bump whenever the fix/validation rules change
+VALIDATION_RULES_VERSION = 1
+
+def _copy_result(result):
+    """
+    Copy a cached validation result so callers never share containers with
+    the cache. Results only nest a 'validation_result' dict and 'warnings'
+    lists, so this is much cheaper than copy.deepcopy; a warnings list shared
+    by both levels stays shared in the copy.
+    """
+    copied = dict(result)
+    warnings = result.get('warnings')
+    if warnings is not None:
+        copied['warnings'] = list(warnings)
+    
+    validation = result.get('validation_result')
+    if validation is not None:
+        copied['validation_result'] = dict(validation)
+        nested_warnings = validation.get('warnings')
+        if nested_warnings is not None:
+            copied['validation_result']['warnings'] = (
+                copied['warnings'] if nested_warnings is warnings else list(nested_warnings)
+            )
+    return copied
 
 class QueryValidator:
     def __init__(self):
@@ -45,9 +75,29 @@ class QueryValidator:
             'action_stats': "'Log Source' in ('OCI VCN Flow Unified Schema Logs') and Action in ('drop', 'reject') | stats count by Action | head 10",
             'timestats': "* | timestats count by 'Log Source' span=1h"
         }
+        
+        # LRU cache of validation results keyed by (rules version, query digest).
+        # Bump rules_version after editing the rule tables above at runtime.
+        self.rules_version = VALIDATION_RULES_VERSION
+        self._validation_cache = OrderedDict()
     
     def validate_and_fix_query(self, query):
-        """Main validation and fixing method"""
+        """Main validation and fixing method (results are cached per query)"""
+        key = (self.rules_version, hashlib.blake2b(query.encode('utf-8'), digest_size=16).digest())
+        cached = self._validation_cache.get(key)
+        if cached is not None:
+            self._validation_cache.move_to_end(key)
+            return _copy_result(cached)
+        
+        # The cached object itself is never handed out, only copies of it
+        result = self._validate_and_fix_query(query)
+        self._validation_cache[key] = result
+        if len(self._validation_cache) > VALIDATION_CACHE_SIZE:
+            self._validation_cache.popitem(last=False)
+        return _copy_result(result)
+    
+    def _validate_and_fix_query(self, query):
+        """Run the full validation and fixing pipeline"""
         try:
             # Check if this is a query that should be preserved as-is
             if self._should_preserve_query(query):
@@ -197,13 +197,15 @@ Add this environment configuration in Settings → Environments:
 
 ## Verification
 
-To verify instance principal is working:
+To verify instance principal is working (the dynamic group and policies must be
+in place, so this makes a real Identity API call):
 
 \`\`\`bash
-python3 scripts/check_oci_instance.py
+python3 scripts/check_oci_instance.py --validate
 \`\`\`
 
-Look for: "instance_principal": true in the output.
+Look for: "instance_principal": true in the output. Without --validate the check
+only confirms a signer can be built, which succeeds before any policy exists.
 
 ## Troubleshooting
 
@@ -12,7 +12,10 @@ export async function GET(request: NextRequest) {
     const result = JSON.parse(stdout)
     
     // Add additional context for the frontend
-    if (result.is_oci_instance && !result.auth_methods.instance_principal) {
+    // instance_principal is null when the check was skipped because a resource principal is configured
+    if (result.is_oci_instance &&
+        result.auth_methods.instance_principal === false &&
+        !result.auth_methods.resource_principal) {
       result.action_required = {
         type: 'setup_instance_principal',
         message: 'Running on OCI instance but instance principal not configured',